@@ -1,11 +1,15 @@
 import asyncio
-import csv
 import logging
+import multiprocessing
+import os
+import random
 import re
 import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Any, Iterator
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Protocol
 
 import httpx
 from lxml import etree
@@ -44,6 +48,237 @@ GRANULARITY_META: dict[GranularityEnum, GranularityMeta] = {
 }
 
 
+def format_api_date(value: date) -> str:
+    """Formats a date as the MMDDYYYYHHMM period bound (at midnight) used by the API."""
+    return f"{value.month:02d}{value.day:02d}{value.year:04d}0000"
+
+
+@dataclass(frozen=True)
+class DateChunk:
+    """
+    Date range covered by a single xexport request.
+
+    Attributes:
+        start: First day of the chunk in YYYY-MM-DD format
+        end: Last day of the chunk in YYYY-MM-DD format
+        api_start: Start in the MMDDYYYYHHMM format sent to the API
+        api_end: End in the MMDDYYYYHHMM format sent to the API
+    """
+
+    start: str
+    end: str
+    api_start: str
+    api_end: str
+
+    @classmethod
+    def from_dates(cls, start: date, end: date) -> "DateChunk":
+        """Builds a chunk from date bounds, formatting each value once."""
+        return cls(
+            start.isoformat(),
+            end.isoformat(),
+            format_api_date(start),
+            format_api_date(end),
+        )
+
+
+# Output row as written to CSV: (uzel, hodnota, cas)
+Row = tuple[str, str, str]
+
+
+class RowWriter(Protocol):
+    """Sink for parsed rows, such as component.CsvRowWriter or csv.writer."""
+
+    def writerows(self, rows: Iterable[Row]) -> None: ...
+
+
+# Parser reused for the small SOAP documents read with etree.fromstring (logon
+# responses and faults); only ever used from the main thread
+SOAP_PARSER = etree.XMLParser(resolve_entities=False, collect_ids=False)
+
+# Precompiled XPath expressions reused across SOAP responses
+XPATH_KEY = etree.XPath("//key/text()")
+XPATH_FAULTSTRING = etree.XPath("//faultstring/text()")
+
+# Fault returned by logonex while a previous session of the user is still open
+ALREADY_LOGGED_IN_MESSAGE = "již v systému přihlášen"
+
+# SOAP request templates, rendered straight to bytes for the HTTP client
+LOGON_REQUEST_TEMPLATE = b"""
+        <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
+               soap:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"
+               xmlns:ene="ENERGIS-URL">
+            <soap:Body>
+                <ene:logonex>
+                    <username>%s</username>
+                    <password>%s</password>
+                </ene:logonex>
+            </soap:Body>
+        </soap:Envelope>
+        """
+
+# The xexport body is split at the period so the invariant prefix (credentials,
+# nodes, granularity) is rendered once per run and only the dates vary per chunk
+XEXPORT_REQUEST_PREFIX_TEMPLATE = b"""<?xml version="1.0" encoding="UTF-8"?>
+        <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
+                       soap:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"
+                       xmlns:ene="ENERGIS-URL">
+            <soap:Header>
+                <ene:Auth>
+                    <exuziv>%s</exuziv>
+                    <exklic>%s</exklic>
+                </ene:Auth>
+            </soap:Header>
+            <soap:Body>
+                <ene:xexport>
+                    <uzel>%s</uzel>
+                    <typuz>2</typuz>
+                    <per>%s</per>
+                    <cas>"""
+
+XEXPORT_REQUEST_SUFFIX = b"""</cas>
+                    <typhodn>hodnota</typhodn>
+                </ene:xexport>
+            </soap:Body>
+        </soap:Envelope>"""
+
+LOGON_REQUEST_HEADERS = {
+    "Content-Type": "text/xml; charset=utf-8",
+    "SOAPAction": "logonex",
+}
+XEXPORT_REQUEST_HEADERS = {
+    "Content-Type": "text/xml; charset=utf-8",
+    "SOAPAction": "xexport",
+}
+
+# Sensitive SOAP fields masked in debug logs, matched in a single pass
+SENSITIVE_FIELDS_RE = re.compile(
+    r"<(username|password|exuziv|exklic)>(.*?)</\1>", re.IGNORECASE | re.DOTALL
+)
+
+
+QUARTER_MAP = {"I": "Q1", "II": "Q2", "III": "Q3", "IV": "Q4"}
+
+
+def _format_passthrough(value: str) -> str:
+    """Returns year and month values unchanged."""
+    return value
+
+
+def _format_quarter(value: str) -> str:
+    """Converts 'III/2025' to 'Q3/2025'."""
+    quarter, year = value.split("/")
+    return f"{QUARTER_MAP.get(quarter, quarter)}/{year}"
+
+
+@lru_cache(maxsize=None)
+def _format_day(value: str) -> str:
+    """Converts 'DD.MM.YYYY' to 'YYYY-MM-DD' without going through strptime."""
+    day, month, year = value.split(".")
+    return date(int(year), int(month), int(day)).isoformat()
+
+
+def _format_time(value: str) -> str:
+    """Converts 'DD.MM.YYYY HH-HH' or 'DD.MM.YYYY HH:MM-HH:MM' to 'YYYY-MM-DD HH:MM'."""
+    # Fixed-width layouts from the API: slice out the start time and validate
+    # the day through the cached day formatter, hit once per calendar day. Any
+    # other layout (e.g. times with seconds) falls back to splitting
+    if len(value) >= 14 and value[2] == "." and value[5] == "." and value[10] == " ":
+        if value[13] == "-":
+            return f"{_format_day(value[:10])} {value[11:13]}:00"
+        if len(value) >= 17 and value[13] == ":" and value[16] == "-":
+            return f"{_format_day(value[:10])} {value[11:16]}"
+    day_part, time_part = value.split(" ")
+    start_time = time_part.split("-")[0]
+    if ":" not in start_time:
+        return f"{_format_day(day_part)} {start_time}:00"
+    return f"{_format_day(day_part)} {start_time}"
+
+
+# Per-granularity formatters for the 'cas' column, resolved once per chunk
+DATETIME_FORMATTERS: dict[GranularityEnum, Callable[[str], str]] = {
+    GranularityEnum.year: _format_passthrough,
+    GranularityEnum.quarterYear: _format_quarter,
+    GranularityEnum.month: _format_passthrough,
+    GranularityEnum.day: _format_day,
+    GranularityEnum.hour: _format_time,
+    GranularityEnum.quarterHour: _format_time,
+    GranularityEnum.minute: _format_time,
+}
+
+
+class XexportRowTarget:
+    """
+    lxml parser target collecting xexport rows without building an element tree.
+
+    Receives SAX-like callbacks from libxml2 and keeps only the text of the
+    uzel/hodnota/cas children of the current responseData element.
+    """
+
+    ROW_TAG = "responseData"
+    FIELD_TAGS = frozenset(("uzel", "hodnota", "cas"))
+
+    def __init__(self, format_cas: Callable[[str], str]):
+        # Rows of different nodes repeat the same timestamps, so each distinct
+        # 'cas' value is formatted once per parsed response
+        self.format_cas = lru_cache(maxsize=None)(format_cas)
+        self.rows: list[Row] = []
+        self._in_row = False
+        self._field: str | None = None
+        self._text: list[str] = []
+        self._values: dict[str, str] = {}
+
+    def create_parser(self) -> etree.XMLParser:
+        """Creates a parser delivering events to this target."""
+        return etree.XMLParser(
+            target=self,
+            huge_tree=True,
+            collect_ids=False,
+            resolve_entities=False,
+        )
+
+    def start(self, tag: str, attrib: dict) -> None:
+        if tag == self.ROW_TAG:
+            self._in_row = True
+            self._values = {}
+        elif self._in_row and tag in self.FIELD_TAGS:
+            self._field = tag
+            self._text = []
+
+    def data(self, data: str) -> None:
+        # libxml2 delivers one text node in several calls, e.g. around
+        # character references, so field text is joined in end()
+        if self._field is not None:
+            self._text.append(data)
+
+    def end(self, tag: str) -> None:
+        if tag == self._field:
+            self._values[tag] = "".join(self._text)
+            self._field = None
+        elif tag == self.ROW_TAG:
+            self._in_row = False
+            uzel = self._values.get("uzel")
+            hodnota = self._values.get("hodnota")
+            cas = self._values.get("cas")
+            if uzel and hodnota and cas:
+                self.rows.append((uzel, hodnota, self.format_cas(cas)))
+
+    def close(self) -> list[Row]:
+        """Returns the collected rows; lxml passes this on from parser.close()."""
+        return self.rows
+
+
+def parse_xexport_content(content: bytes, granularity: GranularityEnum) -> list[Row]:
+    """
+    Parses a complete xexport SOAP response into (uzel, hodnota, cas) rows.
+
+    Defined at module level so it can be submitted to a worker process.
+    """
+    target = XexportRowTarget(EnergisClient.format_datetime_for(granularity))
+    parser = target.create_parser()
+    parser.feed(content)
+    return parser.close()
+
+
 class EnergisClient:
     """API Client for Energis API using async httpx with streaming CSV output."""
 
@@ -63,43 +298,65 @@ class EnergisClient:
     # Calculate max rows per chunk from memory limit
     MAX_ROWS_PER_CHUNK = (MAX_CHUNK_SIZE_MB * 1024 * 1024) // BYTES_PER_ROW
 
+    # Max parsed chunks waiting for the CSV writer before fetchers block. Each
+    # batch is a whole chunk (up to MAX_ROWS_PER_CHUNK rows), so at most
+    # 2 * MAX_CONCURRENT + 1 parsed chunks are in memory: queued, held by
+    # blocked fetchers and being written
+    MAX_QUEUED_BATCHES = MAX_CONCURRENT
+
     @staticmethod
     def mask_sensitive_data(body: str, mask_char: str = "*") -> str:
         """Masks sensitive fields in the SOAP XML body."""
-        fields_to_mask = ["username", "password", "exuziv", "exklic"]
-        for field in fields_to_mask:
-            pattern = f"<{field}>(.*?)</{field}>"
 
-            def mask_match(match: re.Match) -> str:
-                value = match.group(1)
-                if len(value) > 1:
-                    masked_value = f"{value[0].lower()}{mask_char * (len(value))}"
-                else:
-                    masked_value = mask_char
-                return f"<{field}>{masked_value}</{field}>"
+        def mask_match(match: re.Match) -> str:
+            field, value = match.group(1).lower(), match.group(2)
+            if len(value) > 1:
+                masked_value = value[0] + mask_char * len(value)
+            else:
+                masked_value = mask_char
+            return f"<{field}>{masked_value}</{field}>"
 
-            body = re.sub(pattern, mask_match, body, flags=re.IGNORECASE)
-        return body
+        return SENSITIVE_FIELDS_RE.sub(mask_match, body)
 
     @staticmethod
     def generate_logon_request(
         username: str, password: str
-    ) -> tuple[str, dict[str, str]]:
+    ) -> tuple[bytes, dict[str, str]]:
         """Generates the SOAP request body and headers for the logonex operation."""
-        soap_body = f"""
-        <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
-               soap:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"
-               xmlns:ene="ENERGIS-URL">
-            <soap:Body>
-                <ene:logonex>
-                    <username>{username}</username>
-                    <password>{password}</password>
-                </ene:logonex>
-            </soap:Body>
-        </soap:Envelope>
-        """
-        headers = {"Content-Type": "text/xml; charset=utf-8", "SOAPAction": "logonex"}
-        return soap_body, headers
+        soap_body = LOGON_REQUEST_TEMPLATE % (
+            username.encode("utf-8"),
+            password.encode("utf-8"),
+        )
+        return soap_body, LOGON_REQUEST_HEADERS
+
+    @staticmethod
+    def generate_xexport_request_prefix(
+        username: str, key: str, nodes: list[int], granularity: str
+    ) -> bytes:
+        """Generates the part of the xexport SOAP body preceding the requested period."""
+        nodes_str = ",".join(map(str, nodes))
+        return XEXPORT_REQUEST_PREFIX_TEMPLATE % (
+            username.encode("utf-8"),
+            key.encode("utf-8"),
+            nodes_str.encode("ascii"),
+            granularity.encode("ascii"),
+        )
+
+    @staticmethod
+    def complete_xexport_request(
+        prefix: bytes, date_from: str, date_to: str
+    ) -> tuple[bytes, dict[str, str]]:
+        """Appends the requested period to a prebuilt xexport body prefix."""
+        soap_body = b"".join(
+            (
+                prefix,
+                date_from.encode("ascii"),
+                b",",
+                date_to.encode("ascii"),
+                XEXPORT_REQUEST_SUFFIX,
+            )
+        )
+        return soap_body, XEXPORT_REQUEST_HEADERS
 
     @staticmethod
     def generate_xexport_request(
@@ -109,31 +366,12 @@ class EnergisClient:
         date_from: str,
         date_to: str,
         granularity: str,
-    ) -> tuple[str, dict[str, str]]:
+    ) -> tuple[bytes, dict[str, str]]:
         """Generates the SOAP request body and headers for the xexport operation."""
-        nodes_str = ",".join(map(str, nodes))
-        soap_body = f"""<?xml version="1.0" encoding="UTF-8"?>
-        <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
-                       soap:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/"
-                       xmlns:ene="ENERGIS-URL">
-            <soap:Header>
-                <ene:Auth>
-                    <exuziv>{username}</exuziv>
-                    <exklic>{key}</exklic>
-                </ene:Auth>
-            </soap:Header>
-            <soap:Body>
-                <ene:xexport>
-                    <uzel>{nodes_str}</uzel>
-                    <typuz>2</typuz>
-                    <per>{granularity}</per>
-                    <cas>{date_from},{date_to}</cas>
-                    <typhodn>hodnota</typhodn>
-                </ene:xexport>
-            </soap:Body>
-        </soap:Envelope>"""
-        headers = {"Content-Type": "text/xml; charset=utf-8", "SOAPAction": "xexport"}
-        return soap_body, headers
+        prefix = EnergisClient.generate_xexport_request_prefix(
+            username, key, nodes, granularity
+        )
+        return EnergisClient.complete_xexport_request(prefix, date_from, date_to)
 
     @staticmethod
     def granularity_to_short_code(granularity: GranularityEnum) -> str:
@@ -144,45 +382,29 @@ class EnergisClient:
     def convert_date_to_mmddyyyyhhmm(date_str: str) -> str:
         """Converts a date string from 'YYYY-MM-DD' format to 'MMDDYYYYHHMM'."""
         try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            return date_obj.strftime("%m%d%Y0000")
+            return format_api_date(date.fromisoformat(date_str))
         except ValueError:
             raise ValueError(
                 f"Invalid date format: {date_str}. Expected format: YYYY-MM-DD"
             )
 
+    @staticmethod
+    def format_datetime_for(granularity: GranularityEnum) -> Callable[[str], str]:
+        """Returns the datetime formatter for the given granularity."""
+        formatter = DATETIME_FORMATTERS.get(granularity)
+        if formatter is None:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        return formatter
+
     @staticmethod
     def format_datetime(value: str, granularity: GranularityEnum) -> str:
         """Formats datetime value based on granularity."""
-        match granularity:
-            case GranularityEnum.year:
-                return value
-            case GranularityEnum.quarterYear:
-                quarter_map = {"I": "Q1", "II": "Q2", "III": "Q3", "IV": "Q4"}
-                quarter, year = value.split("/")
-                return f"{quarter_map.get(quarter, quarter)}/{year}"
-            case GranularityEnum.month:
-                return value
-            case GranularityEnum.day:
-                return datetime.strptime(value, "%d.%m.%Y").strftime("%Y-%m-%d")
-            case (
-                GranularityEnum.hour
-                | GranularityEnum.quarterHour
-                | GranularityEnum.minute
-            ):
-                day_part, time_part = value.split(" ")
-                day = datetime.strptime(day_part, "%d.%m.%Y").strftime("%Y-%m-%d")
-                start_time = time_part.split("-")[0]
-                return (
-                    f"{day} {start_time}:00"
-                    if ":" not in start_time
-                    else f"{day} {start_time}"
-                )
-            case _:
-                raise ValueError(f"Unsupported granularity: {granularity}")
+        return EnergisClient.format_datetime_for(granularity)(value)
 
     def __init__(self, config: "Configuration"):
         self.config = config
+        self.auth_url = f"{config.authentication.api_base_url}?logon"
+        self.data_url = f"{config.authentication.api_base_url}?data"
 
         logging.getLogger("httpx").setLevel(logging.WARNING)
         logging.getLogger("httpcore").setLevel(logging.WARNING)
@@ -193,30 +415,57 @@ class EnergisClient:
             timeout=httpx.Timeout(self.READ_TIMEOUT, connect=self.CONNECT_TIMEOUT),
         )
         self.max_retries = 5
-        self.retry_delay = 120
+        # Exponential backoff for the 'already logged in' fault: 15 s, 30 s, ...
+        self.retry_delay = 15
+        self.max_retry_delay = 600
+        self.retry_jitter = 5
         self.auth_key = None
 
+    @staticmethod
+    def _parse_logon_response(content: bytes) -> tuple[str | None, str | None]:
+        """Extracts the key and the SOAP faultstring from a single parse of a logon response."""
+        try:
+            xml_response = etree.fromstring(content, SOAP_PARSER)
+        except etree.XMLSyntaxError:
+            return None, None  # Not a SOAP response
+        key = XPATH_KEY(xml_response)
+        fault_string = XPATH_FAULTSTRING(xml_response)
+        return key[0] if key else None, fault_string[0] if fault_string else None
+
+    @staticmethod
+    def _is_already_logged_in_fault(fault_string: str | None) -> bool:
+        """Checks whether a SOAP faultstring is the 'user already logged in' fault."""
+        return fault_string is not None and ALREADY_LOGGED_IN_MESSAGE in fault_string
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Returns the capped exponential delay with jitter before the given retry."""
+        delay = min(self.max_retry_delay, self.retry_delay * 2**attempt)
+        return delay + random.uniform(0, self.retry_jitter)
+
     def authenticate(self) -> str:
         """Calls the auth endpoint and retrieves the key for further requests."""
         body, headers = self.generate_logon_request(
             *self.config.authentication.credentials
         )
-        auth_url = f"{self.config.authentication.api_base_url}?logon"
+        auth_url = self.auth_url
 
-        if self.config.debug:
-            masked_body = self.mask_sensitive_data(body)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            masked_body = self.mask_sensitive_data(body.decode("utf-8"))
             logging.debug("Request auth url: %s", auth_url)
             logging.debug("Request header: %s", headers)
             logging.debug("Request body: %s", masked_body)
 
         retries = 0
-        response = None
 
         while retries < self.max_retries:
+            fault_string = None
             try:
                 response = self.auth_client.post(
                     auth_url, content=body, headers=headers
                 )
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logging.debug("Authentication response: %s", response.text)
+                key, fault_string = self._parse_logon_response(response.content)
 
                 if response.status_code != 200:
                     logging.error(
@@ -225,17 +474,12 @@ class EnergisClient:
                     )
                     raise Exception(f"Authentication failed: {response.status_code}")
 
-                logging.debug("Authentication response: %s", response.text)
-
-                xml_response = etree.fromstring(response.content)
-                key = xml_response.xpath("//key/text()")
-
                 if key:
                     logging.debug(
                         "Authentication successful, received key: %s",
-                        key[0][:4] + "****",
+                        key[:4] + "****",
                     )
-                    return key[0]
+                    return key
 
                 raise Exception("Authentication failed: No key found in the response.")
 
@@ -244,26 +488,15 @@ class EnergisClient:
                     "Authentication attempt %d failed: %s", retries + 1, str(e)
                 )
 
-                # Only try to parse SOAP fault if we have a response
-                if response is not None:
-                    try:
-                        xml_response = etree.fromstring(response.content)
-                        fault_string = xml_response.xpath("//faultstring/text()")
-
-                        if (
-                            fault_string
-                            and "již v systému přihlášen" in fault_string[0]
-                        ):
-                            logging.warning(
-                                "User already logged in. Waiting %d seconds before retrying...",
-                                self.retry_delay,
-                            )
-                            time.sleep(self.retry_delay)
-                            retries += 1
-                            response = None
-                            continue
-                    except Exception:
-                        pass  # Failed to parse SOAP fault response, will re-raise original exception
+                if self._is_already_logged_in_fault(fault_string):
+                    delay = self._backoff_delay(retries)
+                    logging.warning(
+                        "User already logged in. Waiting %.0f seconds before retrying...",
+                        delay,
+                    )
+                    time.sleep(delay)
+                    retries += 1
+                    continue
 
                 raise e
 
@@ -296,235 +529,320 @@ class EnergisClient:
 
         return chunk_days
 
+    @staticmethod
+    def _chunk_start_ordinals(start: date, end: date, chunk_days: int) -> range:
+        """Returns the day ordinals at which consecutive, non-overlapping chunks start."""
+        return range(start.toordinal(), end.toordinal(), chunk_days + 1)
+
+    def _count_date_chunks(self, date_from: str, date_to: str, chunk_days: int) -> int:
+        """Returns the number of chunks _generate_date_chunks yields, without generating them."""
+        return len(
+            self._chunk_start_ordinals(
+                date.fromisoformat(date_from), date.fromisoformat(date_to), chunk_days
+            )
+        )
+
     def _generate_date_chunks(
-        self, date_from: str, date_to: str, granularity: GranularityEnum, num_nodes: int
-    ) -> Iterator[tuple[str, str]]:
+        self, date_from: str, date_to: str, chunk_days: int
+    ) -> Iterator[DateChunk]:
         """
-        Generates date range chunks based on memory limit.
+        Lazily generates date range chunks of at most chunk_days + 1 days.
 
         Args:
             date_from: Start date in YYYY-MM-DD format
             date_to: End date in YYYY-MM-DD format
-            granularity: Data granularity level
-            num_nodes: Number of nodes being queried
+            chunk_days: Chunk size from _calculate_chunk_days
 
         Yields:
-            Tuples of (chunk_start, chunk_end) dates in YYYY-MM-DD format
+            DateChunk per request, with dates preformatted for logging and the API
         """
-        chunk_days = self._calculate_chunk_days(granularity, num_nodes)
-        start = datetime.strptime(date_from, "%Y-%m-%d")
-        end = datetime.strptime(date_to, "%Y-%m-%d")
-
-        current_start = start
-        while current_start < end:
-            current_end = min(current_start + timedelta(days=chunk_days), end)
-            yield current_start.strftime("%Y-%m-%d"), current_end.strftime("%Y-%m-%d")
-            current_start = current_end + timedelta(days=1)
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_to)
+
+        # Chunk bounds are stepped as day ordinals (plain ints), so no timedelta
+        # arithmetic is done per chunk
+        end_ordinal = end.toordinal()
+        for start_ordinal in self._chunk_start_ordinals(start, end, chunk_days):
+            yield DateChunk.from_dates(
+                date.fromordinal(start_ordinal),
+                date.fromordinal(min(start_ordinal + chunk_days, end_ordinal)),
+            )
 
-    async def _fetch_chunk_streaming(
+    async def _fetch_chunk(
         self,
         client: httpx.AsyncClient,
-        semaphore: asyncio.Semaphore,
+        parse_pool: Executor | None,
         chunk_idx: int,
         total_chunks: int,
-        chunk_start: str,
-        chunk_end: str,
-        key: str,
+        chunk: DateChunk,
+        request_prefix: bytes,
         data_url: str,
-    ) -> tuple[int, list[dict[str, Any]]]:
+        queue: asyncio.Queue,
+    ) -> int:
         """
-        Fetches data for a single chunk using streaming HTTP and incremental XML parsing.
+        Fetches data for a single chunk and parses it in a worker process.
 
-        Uses httpx.stream() to avoid loading entire response into memory,
-        and XMLPullParser to parse XML incrementally as bytes arrive.
+        The response body is bounded by the chunk sizing (MAX_CHUNK_SIZE_MB),
+        so it is read whole and handed to the process pool. XML parsing and
+        datetime formatting run on other cores while the event loop keeps
+        downloading the remaining chunks.
 
         Args:
             client: Shared httpx AsyncClient
-            semaphore: Semaphore to limit concurrency
+            parse_pool: Executor running parse_xexport_content, None for the
+                event loop's default thread executor
             chunk_idx: Index of this chunk (1-based)
             total_chunks: Total number of chunks
-            chunk_start: Start date for this chunk
-            chunk_end: End date for this chunk
-            key: Authentication key
+            chunk: Date range for this chunk
+            request_prefix: Prebuilt xexport body up to the requested period
             data_url: URL for data requests
+            queue: Queue of row batches consumed by the CSV writer
 
         Returns:
-            Tuple of (chunk_idx, list of row dictionaries)
+            Number of rows fetched for this chunk
         """
-        async with semaphore:
+        logging.info(
+            "Processing chunk %d/%d: %s to %s",
+            chunk_idx,
+            total_chunks,
+            chunk.start,
+            chunk.end,
+        )
+
+        body, headers = self.complete_xexport_request(
+            request_prefix, chunk.api_start, chunk.api_end
+        )
+
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            masked_body = self.mask_sensitive_data(body.decode("utf-8"))
+            logging.debug("Request url: %s", data_url)
+            logging.debug("Request header: %s", headers)
+            logging.debug("Request body: %s", masked_body)
+
+        response = await client.post(data_url, content=body, headers=headers)
+        if response.status_code != 200:
+            try:
+                xml_response = etree.fromstring(response.content, SOAP_PARSER)
+                fault_string = XPATH_FAULTSTRING(xml_response)
+                if fault_string:
+                    error_message = fault_string[0]
+                    logging.error("SOAP Fault: %s", error_message)
+                    raise Exception(f"Data request failed: {error_message}")
+            except etree.XMLSyntaxError:
+                pass
+            raise Exception(
+                f"Data request failed: {response.content.decode('utf-8', errors='replace')}"
+            )
+
+        rows = await asyncio.get_running_loop().run_in_executor(
+            parse_pool,
+            parse_xexport_content,
+            response.content,
+            self.config.sync_options.granularity,
+        )
+        if rows:
+            await queue.put(rows)
             logging.info(
-                "Processing chunk %d/%d: %s to %s",
+                "Chunk %d/%d fetched: %d rows", chunk_idx, total_chunks, len(rows)
+            )
+        else:
+            logging.debug(
+                "Chunk %d/%d fetched: no data for this period",
                 chunk_idx,
                 total_chunks,
-                chunk_start,
-                chunk_end,
             )
+        return len(rows)
 
-            body, headers = self.generate_xexport_request(
-                username=self.config.authentication.username,
-                key=key,
-                nodes=self.config.sync_options.nodes,
-                date_from=self.convert_date_to_mmddyyyyhhmm(chunk_start),
-                date_to=self.convert_date_to_mmddyyyyhhmm(chunk_end),
-                granularity=self.granularity_to_short_code(
-                    self.config.sync_options.granularity
-                ),
-            )
+    def _parse_xexport_response(self, content: bytes) -> list[Row]:
+        """
+        Parses the xexport SOAP response and extracts data rows.
+        Used for testing and fallback scenarios.
 
-            if self.config.debug:
-                masked_body = self.mask_sensitive_data(body)
-                logging.debug("Request url: %s", data_url)
-                logging.debug("Request header: %s", headers)
-                logging.debug("Request body: %s", masked_body)
+        Args:
+            content: Raw response content bytes
 
-            rows: list[dict[str, Any]] = []
+        Returns:
+            List of (uzel, hodnota, cas) row tuples
+        """
+        return parse_xexport_content(content, self.config.sync_options.granularity)
 
-            async with client.stream(
-                "POST", data_url, content=body, headers=headers
-            ) as response:
-                if response.status_code != 200:
-                    error_content = await response.aread()
-                    try:
-                        xml_response = etree.fromstring(error_content)
-                        fault_string = xml_response.find(".//faultstring")
-                        if fault_string is not None:
-                            error_message = fault_string.text
-                            logging.error("SOAP Fault: %s", error_message)
-                            raise Exception(f"Data request failed: {error_message}")
-                    except etree.XMLSyntaxError:
-                        pass
-                    raise Exception(
-                        f"Data request failed: {error_content.decode('utf-8', errors='replace')}"
-                    )
+    async def _fetch_chunks_worker(
+        self,
+        client: httpx.AsyncClient,
+        parse_pool: Executor | None,
+        pending_chunks: Iterator[tuple[int, DateChunk]],
+        total_chunks: int,
+        request_prefix: bytes,
+        data_url: str,
+        queue: asyncio.Queue,
+    ) -> int:
+        """
+        Fetches chunks one by one from the shared iterator until it is exhausted.
 
-                parser = etree.XMLPullParser(events=("end",))
-                granularity = self.config.sync_options.granularity
-
-                async for chunk in response.aiter_bytes():
-                    parser.feed(chunk)
-                    for _, elem in parser.read_events():
-                        if elem.tag == "responseData":
-                            uzel = elem.findtext("uzel")
-                            hodnota = elem.findtext("hodnota")
-                            cas = elem.findtext("cas")
-                            if uzel and hodnota and cas:
-                                rows.append(
-                                    {
-                                        "uzel": uzel,
-                                        "hodnota": hodnota,
-                                        "cas": self.format_datetime(cas, granularity),
-                                    }
-                                )
-                            elem.clear()
-                            while elem.getprevious() is not None:
-                                parent = elem.getparent()
-                                if parent is not None:
-                                    del parent[0]
-
-            if len(rows) > 0:
-                logging.info(
-                    "Chunk %d/%d fetched: %d rows", chunk_idx, total_chunks, len(rows)
-                )
-            else:
-                logging.debug(
-                    "Chunk %d/%d fetched: no data for this period",
-                    chunk_idx,
-                    total_chunks,
-                )
-            return chunk_idx, rows
+        Args:
+            client: Shared httpx AsyncClient
+            parse_pool: Executor running parse_xexport_content, None for the
+                event loop's default thread executor
+            pending_chunks: Iterator of (chunk_idx, chunk) shared by all workers
+            total_chunks: Total number of chunks
+            request_prefix: Prebuilt xexport body up to the requested period
+            data_url: URL for data requests
+            queue: Queue of row batches consumed by the CSV writer
 
-    def _parse_xexport_response(self, content: bytes) -> list[dict[str, Any]]:
+        Returns:
+            Number of rows fetched by this worker
         """
-        Parses the xexport SOAP response and extracts data rows.
-        Used for testing and fallback scenarios.
+        row_count = 0
+        for chunk_idx, chunk in pending_chunks:
+            row_count += await self._fetch_chunk(
+                client,
+                parse_pool,
+                chunk_idx,
+                total_chunks,
+                chunk,
+                request_prefix,
+                data_url,
+                queue,
+            )
+        return row_count
+
+    @staticmethod
+    async def _write_rows(queue: asyncio.Queue, csv_writer: RowWriter) -> None:
+        """
+        Writes row batches from the queue to CSV until a None sentinel arrives.
+
+        Each batch is written in a worker thread so disk I/O does not stall the
+        event loop while other chunks are downloading and parsing.
 
         Args:
-            content: Raw response content bytes
+            queue: Queue of row batches produced by chunk fetchers
+            csv_writer: Writer receiving the parsed rows
+        """
+        while True:
+            rows = await queue.get()
+            if rows is None:
+                return
+            await asyncio.to_thread(csv_writer.writerows, rows)
+
+    def _create_parse_pool(self, total_chunks: int) -> Executor | None:
+        """
+        Creates the process pool for parsing responses, if it can pay off.
+
+        Parsing runs Python callbacks for every node, so a process pool only
+        helps with spare CPUs, and each spawned worker costs a re-import of
+        the component. With one CPU or one chunk, None is returned and parsing
+        runs in the event loop's default thread executor.
+
+        Args:
+            total_chunks: Number of chunks to be parsed
 
         Returns:
-            List of row dictionaries
+            Process pool, or None to parse in the default thread executor
         """
-        rows = []
-        parser = etree.XMLPullParser(events=("end",))
-        parser.feed(content)
-        for _, elem in parser.read_events():
-            if elem.tag == "responseData":
-                uzel = elem.findtext("uzel")
-                hodnota = elem.findtext("hodnota")
-                cas = elem.findtext("cas")
-                if uzel and hodnota and cas:
-                    rows.append(
-                        {
-                            "uzel": uzel,
-                            "hodnota": hodnota,
-                            "cas": self.format_datetime(
-                                cas, self.config.sync_options.granularity
-                            ),
-                        }
-                    )
-                elem.clear()
-        return rows
+        max_workers = min(self.MAX_CONCURRENT, os.cpu_count() or 1, total_chunks)
+        if max_workers <= 1:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
 
     async def _fetch_and_write_chunks(
         self,
-        chunks: list[tuple[str, str]],
+        chunks: Iterable[DateChunk],
+        total_chunks: int,
         key: str,
         data_url: str,
-        csv_writer: csv.DictWriter,
+        csv_writer: RowWriter,
+        parse_pool: Executor | None = None,
     ) -> int:
         """
-        Fetches all chunks concurrently and writes rows directly to CSV.
+        Fetches all chunks concurrently and streams rows directly to CSV.
 
-        Writes each chunk immediately as it completes (no ordering guarantee).
-        This minimizes memory usage since we don't buffer completed chunks.
+        MAX_CONCURRENT workers take chunks from a shared iterator, so only as
+        many requests as can run at once exist at any time. Responses are
+        parsed in a process pool when spare CPUs exist (see
+        _create_parse_pool). Parsed rows go on a bounded
+        queue drained by a single writer task, so chunks are written as they
+        complete (no ordering guarantee) and a slow writer applies backpressure
+        to the downloads.
 
         Args:
-            chunks: List of (chunk_start, chunk_end) tuples
+            chunks: Date chunks to request, consumed lazily by the workers
+            total_chunks: Number of chunks, for progress logging
             key: Authentication key
             data_url: URL for data requests
-            csv_writer: CSV DictWriter to write rows to
+            csv_writer: Writer receiving the parsed rows
+            parse_pool: Executor running parse_xexport_content; by default
+                one is chosen by _create_parse_pool and owned by this call
 
         Returns:
             Total number of rows written
         """
-        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT)
-        total_chunks = len(chunks)
-        total_rows = 0
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_QUEUED_BATCHES)
+        request_prefix = self.generate_xexport_request_prefix(
+            username=self.config.authentication.username,
+            key=key,
+            nodes=self.config.sync_options.nodes,
+            granularity=self.granularity_to_short_code(
+                self.config.sync_options.granularity
+            ),
+        )
 
         logging.info("Using %d concurrent requests", self.MAX_CONCURRENT)
 
+        writer_task = asyncio.create_task(self._write_rows(queue, csv_writer))
+        owns_parse_pool = parse_pool is None
+        if owns_parse_pool:
+            parse_pool = self._create_parse_pool(total_chunks)
         async with httpx.AsyncClient(
             verify=False,
             timeout=httpx.Timeout(self.READ_TIMEOUT, connect=self.CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=self.MAX_CONCURRENT,
+                max_keepalive_connections=self.MAX_CONCURRENT,
+            ),
         ) as client:
-            tasks = [
-                asyncio.create_task(
-                    self._fetch_chunk_streaming(
+            pending_chunks = enumerate(chunks, 1)
+            fetch_task = asyncio.gather(
+                *(
+                    self._fetch_chunks_worker(
                         client,
-                        semaphore,
-                        idx,
+                        parse_pool,
+                        pending_chunks,
                         total_chunks,
-                        chunk_start,
-                        chunk_end,
-                        key,
+                        request_prefix,
                         data_url,
+                        queue,
                     )
+                    for _ in range(min(self.MAX_CONCURRENT, total_chunks))
                 )
-                for idx, (chunk_start, chunk_end) in enumerate(chunks, 1)
-            ]
-            for completed_task in asyncio.as_completed(tasks):
-                _, rows = await completed_task
-                for row in rows:
-                    csv_writer.writerow(row)
-                total_rows += len(rows)
-        return total_rows
-
-    def fetch_data(self, csv_writer: csv.DictWriter) -> int:
+            )
+            try:
+                # The writer only finishes early if it failed; surface that
+                # instead of leaving fetchers blocked on a full queue
+                await asyncio.wait(
+                    {fetch_task, writer_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if writer_task.done():
+                    writer_task.result()
+                row_counts = await fetch_task
+                await queue.put(None)
+                await writer_task
+            finally:
+                fetch_task.cancel()
+                writer_task.cancel()
+                await asyncio.gather(fetch_task, writer_task, return_exceptions=True)
+                if owns_parse_pool and parse_pool is not None:
+                    parse_pool.shutdown(cancel_futures=True)
+        return sum(row_counts)
+
+    def fetch_data(self, csv_writer: RowWriter) -> int:
         """
         Fetches data from the Energis API and writes directly to CSV.
 
         Args:
-            csv_writer: CSV DictWriter to write rows to
+            csv_writer: Writer receiving the parsed rows
 
         Returns:
             Total number of rows written
@@ -533,15 +851,13 @@ class EnergisClient:
         dataset = self.config.sync_options.dataset
         date_from = self.config.sync_options.date_from
         date_to = self.config.sync_options.date_to
-        data_url = f"{self.config.authentication.api_base_url}?data"
+        data_url = self.data_url
 
         if dataset == DatasetEnum.xexport:
             granularity = self.config.sync_options.granularity
             num_nodes = len(self.config.sync_options.nodes)
-            chunks = list(
-                self._generate_date_chunks(date_from, date_to, granularity, num_nodes)
-            )
-            total_chunks = len(chunks)
+            chunk_days = self._calculate_chunk_days(granularity, num_nodes)
+            total_chunks = self._count_date_chunks(date_from, date_to, chunk_days)
 
             logging.info(
                 "Fetching %d node(s), date range %s to %s, %d chunk(s), granularity '%s'",
@@ -553,6 +869,12 @@ class EnergisClient:
             )
 
             return asyncio.run(
-                self._fetch_and_write_chunks(chunks, key, data_url, csv_writer)
+                self._fetch_and_write_chunks(
+                    self._generate_date_chunks(date_from, date_to, chunk_days),
+                    total_chunks,
+                    key,
+                    data_url,
+                    csv_writer,
+                )
             )
         return 0
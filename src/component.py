@@ -1,9 +1,9 @@
-import csv
 import logging
 import os
 import re
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import timedelta
+from typing import BinaryIO, Iterable, Sequence
 
 from keboola.component.base import ComponentBase
 from keboola.component.exceptions import UserException
@@ -13,9 +13,12 @@ from configuration import (
     GranularityEnum,
     DATASET_UNIQUE_FIELDS,
     DATASET_OUTPUT_FIELDS,
+    parse_iso_date,
 )
 from api_client import EnergisClient
 
+UPPERCASE_LETTER_RE = re.compile(r"([A-Z])")
+
 
 @dataclass
 class FileMetadata:
@@ -26,6 +29,48 @@ class FileMetadata:
     file_path: str
 
 
+class CsvRowWriter:
+    """
+    Writes rows as UTF-8 CSV bytes with the same output as csv.writer defaults.
+
+    Energis values (node ids, numbers, formatted timestamps) almost never need
+    quoting, so rows are joined directly and only fields containing a comma,
+    quote or line break go through the quoting path.
+    """
+
+    LINE_TERMINATOR = "\r\n"
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+
+    @staticmethod
+    def _quote_field(field: str) -> str:
+        if "," in field or '"' in field or "\n" in field or "\r" in field:
+            return '"' + field.replace('"', '""') + '"'
+        return field
+
+    @classmethod
+    def _format_row(cls, row: Sequence[str]) -> str:
+        line = ",".join(row)
+        if (
+            '"' in line
+            or "\n" in line
+            or "\r" in line
+            or line.count(",") != len(row) - 1
+        ):
+            return ",".join(map(cls._quote_field, row))
+        return line
+
+    def writerow(self, row: Sequence[str]) -> None:
+        self.writerows((row,))
+
+    def writerows(self, rows: Iterable[Sequence[str]]) -> None:
+        lines = [self._format_row(row) for row in rows]
+        if lines:
+            lines.append("")
+            self.file.write(self.LINE_TERMINATOR.join(lines).encode("utf-8"))
+
+
 class Component(ComponentBase):
     def __init__(self):
         super().__init__()
@@ -36,8 +81,8 @@ class Component(ComponentBase):
     def run(self):
         """Main execution code."""
         last_processed_date = self._get_last_processed_date()
-        self.config = Configuration(
-            last_processed_date=last_processed_date, **self.configuration.parameters
+        self.config = Configuration.from_dict(
+            self.configuration.parameters, last_processed_date=last_processed_date
         )
         self.client = EnergisClient(self.config)
         self.output_dir = os.path.join(self.configuration.data_dir, "out", "tables")
@@ -59,9 +104,8 @@ class Component(ComponentBase):
         last_processed_date = state.get("last_processed_date")
         if last_processed_date:
             try:
-                last_date = datetime.strptime(last_processed_date, "%Y-%m-%d").date()
-                adjusted_date = last_date - timedelta(days=1)
-                return str(adjusted_date)
+                last_date = parse_iso_date(last_processed_date)
+                return (last_date - timedelta(days=1)).isoformat()
             except ValueError:
                 logging.warning(
                     "Invalid date format in state file: %s", last_processed_date
@@ -83,17 +127,15 @@ class Component(ComponentBase):
     @staticmethod
     def _granularity_to_filename(granularity: GranularityEnum) -> str:
         """Returns a descriptive filename component based on the GranularityEnum value."""
-        return re.sub(r"([A-Z])", r"_\1", granularity.value).lower()
+        return UPPERCASE_LETTER_RE.sub(r"_\1", granularity.value).lower()
 
     def _fetch_and_save_to_csv(self, file_metadata: FileMetadata) -> bool:
         """Fetches data and saves directly to CSV. Returns True if data was written."""
-        fieldnames = DATASET_OUTPUT_FIELDS.get(self.config.sync_options.dataset, [])
+        fieldnames = DATASET_OUTPUT_FIELDS.get(self.config.sync_options.dataset, ())
         try:
-            with open(
-                file_metadata.file_path, mode="w", newline="", encoding="utf-8"
-            ) as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-                writer.writeheader()
+            with open(file_metadata.file_path, mode="wb") as csv_file:
+                writer = CsvRowWriter(csv_file)
+                writer.writerow(fieldnames)
                 row_count = self.client.fetch_data(writer)
             if row_count == 0:
                 logging.info("No data found")
@@ -110,11 +152,11 @@ class Component(ComponentBase):
 
     def _create_manifest(self, file_metadata: FileMetadata) -> None:
         """Creates a Keboola manifest file for the output table."""
-        primary_keys = DATASET_UNIQUE_FIELDS.get(self.config.sync_options.dataset, [])
+        primary_keys = DATASET_UNIQUE_FIELDS.get(self.config.sync_options.dataset, ())
         output_table = self.create_out_table_definition(
             file_metadata.file_name,
             incremental=True,
-            primary_key=primary_keys,
+            primary_key=list(primary_keys),
             destination=f"out.c-data.{file_metadata.table_name}",
         )
         self.write_manifest(output_table)
@@ -1,8 +1,10 @@
 import logging
+import re
 from datetime import date
 from enum import Enum
+from types import MappingProxyType
 
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 from keboola.component.exceptions import UserException
 
 
@@ -21,9 +23,11 @@ class DatasetEnum(str, Enum):
     xexport = "xexport"
 
 
-DATASET_UNIQUE_FIELDS = {DatasetEnum.xexport: ["uzel", "cas"]}
+DATASET_UNIQUE_FIELDS = MappingProxyType({DatasetEnum.xexport: ("uzel", "cas")})
 
-DATASET_OUTPUT_FIELDS = {DatasetEnum.xexport: ["uzel", "hodnota", "cas"]}
+DATASET_OUTPUT_FIELDS = MappingProxyType(
+    {DatasetEnum.xexport: ("uzel", "hodnota", "cas")}
+)
 
 
 class GranularityEnum(str, Enum):
@@ -36,7 +40,22 @@ class GranularityEnum(str, Enum):
     minute = "minute"
 
 
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def parse_iso_date(value: str) -> date:
+    """Parses a strict 'YYYY-MM-DD' date; fromisoformat alone also accepts '20250101'."""
+    if not ISO_DATE_RE.fullmatch(value):
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+    try:
+        return date.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f"Invalid date '{value}': {e}") from e
+
+
 class Authentication(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     username: str
     password: str = Field(alias="#password")
     environment: EnvironmentEnum = Field(
@@ -65,7 +84,9 @@ class SyncOptions(BaseModel):
         default=DatasetEnum.xexport, description="Source dataset for data extraction"
     )
     nodes: list[int] = Field(
-        default=[], description="List of nodes to fetch, e.g. [7090001]"
+        default=[],
+        min_length=1,
+        description="List of nodes to fetch, e.g. [7090001]",
     )
     date_from: str = Field(
         default="2020-01-01",
@@ -83,48 +104,59 @@ class SyncOptions(BaseModel):
         description="When enabled, retrieves the complete dataset from 'date_from', bypassing incremental loading",
     )
 
-    @field_validator("nodes")
-    def must_not_be_empty(cls, values: list[int], info) -> list[int]:
-        if len(values) == 0:
-            raise ValueError(f"Field '{info.field_name}' cannot be empty")
-        return values
-
-    @field_validator("granularity")
-    def validate_granularity(cls, value: GranularityEnum) -> GranularityEnum:
-        if value not in GranularityEnum:
-            allowed_values = "', '".join([e.value for e in GranularityEnum])
-            raise ValueError(
-                f"Invalid value '{value}' for 'granularity'. Must be one of {allowed_values}"
-            )
+    @field_validator("date_from", "date_to")
+    def must_be_iso_date(cls, value: str | None, info) -> str | None:
+        # An empty date_to means "until today", see resolved_date_to
+        if value or info.field_name == "date_from":
+            parse_iso_date(value)
         return value
 
     @property
     def resolved_date_to(self) -> str:
         """Ensures date_to is always a string."""
-        return self.date_to if self.date_to else str(date.today())
+        return self.date_to if self.date_to else date.today().isoformat()
 
 
 class Configuration(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     authentication: Authentication
     sync_options: SyncOptions
     debug: bool = False
 
-    def __init__(self, last_processed_date: str | None = None, **data):
-        try:
-            super().__init__(**data)
-
-            if last_processed_date and not self.sync_options.reload_full_data:
-                self.sync_options.date_from = last_processed_date
+    @classmethod
+    def from_dict(
+        cls, data: dict, last_processed_date: str | None = None
+    ) -> "Configuration":
+        """
+        Validates component parameters and resolves the date range to fetch.
 
-            if not self.sync_options.date_to:
-                self.sync_options.date_to = self.sync_options.resolved_date_to
+        Args:
+            data: Component parameters
+            last_processed_date: Date stored in state by the previous run, if any
 
-            logging.info("Using date_from: %s", self.sync_options.date_from)
-            logging.info("Using date_to: %s", self.sync_options.date_to)
-            logging.info("Using granularity: %s", self.sync_options.granularity.value)
+        Returns:
+            Validated configuration
+        """
+        try:
+            config = cls.model_validate(data)
         except ValidationError as e:
-            error_messages = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
+            error_messages = [
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            ]
             raise UserException(f"Validation Error: {', '.join(error_messages)}")
 
-        if self.debug:
+        sync_options = config.sync_options
+        if last_processed_date and not sync_options.reload_full_data:
+            sync_options.date_from = last_processed_date
+
+        if not sync_options.date_to:
+            sync_options.date_to = sync_options.resolved_date_to
+
+        logging.info("Using date_from: %s", sync_options.date_from)
+        logging.info("Using date_to: %s", sync_options.date_to)
+        logging.info("Using granularity: %s", sync_options.granularity.value)
+
+        if config.debug:
             logging.debug("Component will run in Debug mode")
+        return config
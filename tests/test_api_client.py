@@ -1,34 +1,42 @@
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+from types import SimpleNamespace
+
+import httpx
 import pytest
 from unittest.mock import Mock, patch
 
-from api_client import EnergisClient, GRANULARITY_META
-from configuration import Configuration, DatasetEnum, GranularityEnum
+from api_client import (
+    DateChunk,
+    EnergisClient,
+    GRANULARITY_META,
+    XexportRowTarget,
+    parse_xexport_content,
+)
+from configuration import DatasetEnum, GranularityEnum
 
 
 @pytest.fixture
 def mock_config():
-    """Provides a mock Configuration object."""
-    mock_config = Mock(spec=Configuration)
-
-    mock_auth = Mock()
-    mock_auth.credentials = ("testuser", "testpassword")
-    mock_auth.api_base_url = "https://fake-api.com"
-    mock_auth.username = "testuser"
-
-    mock_config.authentication = mock_auth
-
-    mock_sync_options = Mock()
-    mock_sync_options.dataset = DatasetEnum.xexport
-    mock_sync_options.nodes = [7090001]
-    mock_sync_options.date_from = "2025-01-01"
-    mock_sync_options.date_to = "2025-01-31"
-    mock_sync_options.granularity = GranularityEnum.day
-    mock_sync_options.resolved_date_to = "2025-01-31"
-
-    mock_config.sync_options = mock_sync_options
-    mock_config.debug = False
-
-    return mock_config
+    """Provides a stand-in Configuration with plain attributes."""
+    return SimpleNamespace(
+        authentication=SimpleNamespace(
+            credentials=("testuser", "testpassword"),
+            api_base_url="https://fake-api.com",
+            username="testuser",
+        ),
+        sync_options=SimpleNamespace(
+            dataset=DatasetEnum.xexport,
+            nodes=[7090001],
+            date_from="2025-01-01",
+            date_to="2025-01-31",
+            granularity=GranularityEnum.day,
+            resolved_date_to="2025-01-31",
+        ),
+        debug=False,
+    )
 
 
 @pytest.fixture
@@ -55,6 +63,16 @@ def create_mock_response(status_code, content):
     return response
 
 
+def create_xexport_xml(rows):
+    """Builds an xexport SOAP response body from (uzel, hodnota, cas) tuples."""
+    items = "".join(
+        f"<responseData><uzel>{uzel}</uzel><hodnota>{hodnota}</hodnota>"
+        f"<cas>{cas}</cas></responseData>"
+        for uzel, hodnota, cas in rows
+    )
+    return f"<response>{items}</response>".encode("utf-8")
+
+
 def test_authenticate_success(client, mock_auth_client):
     """Tests successful authentication."""
     xml_response = """<response><key>test-api-key</key></response>"""
@@ -81,12 +99,35 @@ def test_authenticate_retry_on_already_logged_in(client, mock_auth_client):
     xml_response = """<faultstring>Uživatel již v systému přihlášen</faultstring>"""
     mock_auth_client.post.return_value = create_mock_response(500, xml_response)
 
-    with patch("time.sleep", return_value=None) as mock_sleep:
+    with (
+        patch("time.sleep", return_value=None) as mock_sleep,
+        patch("random.uniform", return_value=0),
+    ):
         with pytest.raises(Exception, match="Maximum retries reached"):
             client.authenticate()
 
         assert mock_auth_client.post.call_count == client.max_retries
-        mock_sleep.assert_called_with(client.retry_delay)
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert delays == [
+            client.retry_delay * 2**attempt for attempt in range(client.max_retries)
+        ]
+
+
+def test_already_logged_in_fault_detection():
+    """Tests detection of the 'already logged in' fault in raw and escaped form."""
+    raw = "<faultstring>Uživatel již v systému přihlášen</faultstring>"
+    escaped = raw.encode("ascii", "xmlcharrefreplace")
+
+    for content in (raw.encode("utf-8"), escaped):
+        key, fault_string = EnergisClient._parse_logon_response(content)
+        assert key is None
+        assert EnergisClient._is_already_logged_in_fault(fault_string)
+
+    _, fault_string = EnergisClient._parse_logon_response(
+        b"<faultstring>Invalid password</faultstring>"
+    )
+    assert not EnergisClient._is_already_logged_in_fault(fault_string)
+    assert EnergisClient._parse_logon_response(b"not xml") == (None, None)
 
 
 def test_parse_xexport_response_success(client, mock_config):
@@ -106,7 +147,7 @@ def test_parse_xexport_response_success(client, mock_config):
     results = client._parse_xexport_response(xml_response.encode("utf-8"))
 
     assert len(results) == 1
-    assert results[0] == {"uzel": "7090001", "hodnota": "123.45", "cas": "2025-03-06"}
+    assert results[0] == ("7090001", "123.45", "2025-03-06")
 
 
 def test_parse_xexport_response_hour_granularity(client, mock_config):
@@ -126,7 +167,7 @@ def test_parse_xexport_response_hour_granularity(client, mock_config):
     results = client._parse_xexport_response(xml_response.encode("utf-8"))
 
     assert len(results) == 1
-    assert results[0]["cas"] == "2025-03-06 08:00"
+    assert results[0][2] == "2025-03-06 08:00"
 
 
 def test_parse_xexport_response_empty(client, mock_config):
@@ -162,13 +203,141 @@ def test_parse_xexport_response_multiple_rows(client, mock_config):
     results = client._parse_xexport_response(xml_response.encode("utf-8"))
 
     assert len(results) == 2
-    assert results[0]["uzel"] == "7090001"
-    assert results[1]["uzel"] == "7090002"
+    assert results[0][0] == "7090001"
+    assert results[1][0] == "7090002"
+
+
+def test_xexport_row_target_split_feed():
+    """Tests that rows are assembled when text is split across fed blocks."""
+    target = XexportRowTarget(EnergisClient.format_datetime_for(GranularityEnum.day))
+    parser = target.create_parser()
+    content = create_xexport_xml(
+        [("7090001", "123.45", "06.03.2025"), ("7090002", "6.7", "07.03.2025")]
+    )
+
+    for i in range(len(content)):
+        parser.feed(content[i : i + 1])
+
+    assert parser.close() == [
+        ("7090001", "123.45", "2025-03-06"),
+        ("7090002", "6.7", "2025-03-07"),
+    ]
+
+
+def test_parse_xexport_content_character_reference():
+    """Tests that text split by libxml2 around a character reference is joined."""
+    content = create_xexport_xml([("7090001", "12&#46;5", "06.03.2025")])
+
+    assert parse_xexport_content(content, GranularityEnum.day) == [
+        ("7090001", "12.5", "2025-03-06")
+    ]
+
+
+def test_xexport_row_target_formats_each_cas_once():
+    """Tests that a timestamp shared by several nodes is formatted only once."""
+    format_cas = Mock(
+        side_effect=EnergisClient.format_datetime_for(GranularityEnum.day)
+    )
+    target = XexportRowTarget(format_cas)
+    parser = target.create_parser()
+    parser.feed(
+        create_xexport_xml(
+            [(str(7090001 + node), "1.0", "06.03.2025") for node in range(10)]
+            + [("7090001", "2.0", "07.03.2025")]
+        )
+    )
+    rows = parser.close()
+    assert len(rows) == 11
+    assert {row[2] for row in rows} == {"2025-03-06", "2025-03-07"}
+    assert format_cas.call_count == 2
+
+
+def test_mask_sensitive_data():
+    """Tests masking of credentials in SOAP request bodies."""
+    body = (
+        "<username>testuser</username><password>secret</password>"
+        "<exuziv>u</exuziv><EXKLIC>abc</EXKLIC><uzel>7090001</uzel>"
+    )
+
+    masked = EnergisClient.mask_sensitive_data(body)
+
+    assert "<username>t********</username>" in masked
+    assert "<password>s******</password>" in masked
+    assert "<exuziv>*</exuziv>" in masked
+    assert "<exklic>a***</exklic>" in masked
+    assert "<uzel>7090001</uzel>" in masked
+
+
+def test_generate_xexport_request():
+    """Tests that the xexport SOAP body is rendered as bytes."""
+    body, headers = EnergisClient.generate_xexport_request(
+        username="testuser",
+        key="test-api-key",
+        nodes=[7090001, 7090002],
+        date_from="030120250000",
+        date_to="033120250000",
+        granularity="d",
+    )
+
+    assert isinstance(body, bytes)
+    assert b"<exuziv>testuser</exuziv>" in body
+    assert b"<exklic>test-api-key</exklic>" in body
+    assert b"<uzel>7090001,7090002</uzel>" in body
+    assert b"<per>d</per>" in body
+    assert b"<cas>030120250000,033120250000</cas>" in body
+    assert headers["SOAPAction"] == "xexport"
 
 
 def test_convert_date_to_mmddyyyyhhmm():
     """Tests correct conversion of date format."""
     assert EnergisClient.convert_date_to_mmddyyyyhhmm("2025-03-06") == "030620250000"
+    assert EnergisClient.convert_date_to_mmddyyyyhhmm("0999-12-31") == "123109990000"
+    with pytest.raises(ValueError, match="Invalid date format"):
+        EnergisClient.convert_date_to_mmddyyyyhhmm("2025-02-30")
+
+
+def test_generate_date_chunks(client):
+    """Tests chunk boundaries and their preformatted API dates."""
+    chunk_days = client._calculate_chunk_days(GranularityEnum.minute, 10)
+    chunks = list(client._generate_date_chunks("2025-01-01", "2025-01-10", chunk_days))
+
+    assert client._count_date_chunks("2025-01-01", "2025-01-10", chunk_days) == len(
+        chunks
+    )
+
+    assert [(c.start, c.end) for c in chunks] == [
+        ("2025-01-01", "2025-01-04"),
+        ("2025-01-05", "2025-01-08"),
+        ("2025-01-09", "2025-01-10"),
+    ]
+    assert chunks[0].api_start == "010120250000"
+    assert chunks[0].api_end == "010420250000"
+
+
+@pytest.mark.parametrize(
+    "granularity, num_nodes, date_from, date_to",
+    [
+        (GranularityEnum.minute, 500, "2015-01-01", "2025-12-31"),
+        (GranularityEnum.quarterHour, 50, "2020-01-01", "2025-06-30"),
+        (GranularityEnum.day, 1, "2000-01-01", "2025-12-31"),
+    ],
+)
+def test_generate_date_chunks_large_window(
+    client, granularity, num_nodes, date_from, date_to
+):
+    """Tests that chunks over long ranges tile the range and match the count."""
+    chunk_days = client._calculate_chunk_days(granularity, num_nodes)
+    chunks = list(client._generate_date_chunks(date_from, date_to, chunk_days))
+
+    assert len(chunks) == client._count_date_chunks(date_from, date_to, chunk_days)
+    assert chunks[0].start == date_from
+    assert chunks[-1].end == date_to
+    for previous, current in zip(chunks, chunks[1:]):
+        gap = date.fromisoformat(current.start) - date.fromisoformat(previous.end)
+        assert gap.days == 1
+    for chunk in chunks:
+        span = date.fromisoformat(chunk.end) - date.fromisoformat(chunk.start)
+        assert 0 <= span.days <= chunk_days
 
 
 def test_granularity_to_short_code():
@@ -187,97 +356,150 @@ def test_granularity_meta_complete_coverage():
         assert isinstance(meta.points_per_day, int) and meta.points_per_day > 0
 
 
-class TestFormatDatetime:
-    """Tests for format_datetime static method."""
-
-    def test_year_passthrough(self):
-        """Year granularity returns value unchanged."""
-        assert EnergisClient.format_datetime("2025", GranularityEnum.year) == "2025"
-
-    def test_quarter_year_roman_numerals(self):
-        """QuarterYear converts roman numerals to Q1-Q4 format."""
-        assert (
-            EnergisClient.format_datetime("I/2025", GranularityEnum.quarterYear)
-            == "Q1/2025"
-        )
-        assert (
-            EnergisClient.format_datetime("II/2025", GranularityEnum.quarterYear)
-            == "Q2/2025"
-        )
-        assert (
-            EnergisClient.format_datetime("III/2025", GranularityEnum.quarterYear)
-            == "Q3/2025"
-        )
-        assert (
-            EnergisClient.format_datetime("IV/2025", GranularityEnum.quarterYear)
-            == "Q4/2025"
+@pytest.mark.parametrize(
+    "value, granularity, expected",
+    [
+        # Year and month values pass through unchanged
+        ("2025", GranularityEnum.year, "2025"),
+        ("01/2025", GranularityEnum.month, "01/2025"),
+        # Quarter roman numerals map to Q1-Q4; unknown tokens pass through
+        ("I/2025", GranularityEnum.quarterYear, "Q1/2025"),
+        ("II/2025", GranularityEnum.quarterYear, "Q2/2025"),
+        ("III/2025", GranularityEnum.quarterYear, "Q3/2025"),
+        ("IV/2025", GranularityEnum.quarterYear, "Q4/2025"),
+        ("V/2025", GranularityEnum.quarterYear, "V/2025"),
+        # Day converts DD.MM.YYYY to YYYY-MM-DD
+        ("06.03.2025", GranularityEnum.day, "2025-03-06"),
+        ("31.12.2024", GranularityEnum.day, "2024-12-31"),
+        # Hour ranges without minutes get :00
+        ("06.03.2025 08-09", GranularityEnum.hour, "2025-03-06 08:00"),
+        ("06.03.2025 23-00", GranularityEnum.hour, "2025-03-06 23:00"),
+        # Ranges with minutes keep the start time
+        ("06.03.2025 08:15-08:30", GranularityEnum.quarterHour, "2025-03-06 08:15"),
+        ("06.03.2025 23:45-00:00", GranularityEnum.quarterHour, "2025-03-06 23:45"),
+        ("06.03.2025 08:01-08:02", GranularityEnum.minute, "2025-03-06 08:01"),
+        # Start times with seconds are kept whole
+        (
+            "06.03.2025 08:00:00-08:01:00",
+            GranularityEnum.minute,
+            "2025-03-06 08:00:00",
+        ),
+        # Non fixed-width timestamps are still parsed field by field
+        ("6.3.2025 08:15-08:30", GranularityEnum.hour, "2025-03-06 08:15"),
+    ],
+)
+def test_format_datetime(value, granularity, expected):
+    """Tests format_datetime conversions for each granularity."""
+    assert EnergisClient.format_datetime(value, granularity) == expected
+
+
+@pytest.mark.parametrize(
+    "value, granularity",
+    [
+        ("31.02.2025", GranularityEnum.day),  # Invalid date
+        ("06.03.2025", GranularityEnum.hour),  # Missing time part
+        ("31.02.2025 08-09", GranularityEnum.hour),  # Invalid date
+        ("99.99.2025 08:15-08:30", GranularityEnum.quarterHour),  # Invalid date
+    ],
+)
+def test_format_datetime_raises(value, granularity):
+    """Tests that malformed values raise ValueError."""
+    with pytest.raises(ValueError):
+        EnergisClient.format_datetime(value, granularity)
+
+
+def test_fetch_and_write_chunks(client):
+    """Tests that rows from all chunks are streamed to the CSV writer."""
+    responses = {
+        b"<cas>010120250000,011020250000</cas>": create_xexport_xml(
+            [("7090001", "1.5", "01.01.2025"), ("7090001", "2.5", "02.01.2025")]
+        ),
+        b"<cas>011120250000,013120250000</cas>": create_xexport_xml(
+            [("7090001", "3.5", "11.01.2025")]
+        ),
+    }
+
+    def handler(request):
+        for cas, content in responses.items():
+            if cas in request.content:
+                return httpx.Response(200, content=content)
+        return httpx.Response(500, content=b"<faultstring>Unknown period</faultstring>")
+
+    transport = httpx.MockTransport(handler)
+    async_client = functools.partial(httpx.AsyncClient, transport=transport)
+    writer = Mock()
+
+    with (
+        patch("api_client.httpx.AsyncClient", async_client),
+        ThreadPoolExecutor(max_workers=2) as parse_pool,
+    ):
+        total = asyncio.run(
+            client._fetch_and_write_chunks(
+                [
+                    DateChunk.from_dates(date(2025, 1, 1), date(2025, 1, 10)),
+                    DateChunk.from_dates(date(2025, 1, 11), date(2025, 1, 31)),
+                ],
+                2,
+                "test-api-key",
+                "https://fake-api.com?data",
+                writer,
+                parse_pool=parse_pool,
+            )
         )
 
-    def test_quarter_year_unknown_quarter(self):
-        """QuarterYear with unknown quarter token passes through unchanged."""
-        assert (
-            EnergisClient.format_datetime("V/2025", GranularityEnum.quarterYear)
-            == "V/2025"
-        )
+    written = [row for call in writer.writerows.call_args_list for row in call.args[0]]
+    assert total == 3
+    assert sorted(written) == [
+        ("7090001", "1.5", "2025-01-01"),
+        ("7090001", "2.5", "2025-01-02"),
+        ("7090001", "3.5", "2025-01-11"),
+    ]
+
+
+def test_fetch_and_write_chunks_soap_fault(client):
+    """Tests that a SOAP fault in a data request is raised to the caller."""
+
+    def handler(request):
+        return httpx.Response(500, content=b"<faultstring>Invalid node</faultstring>")
+
+    transport = httpx.MockTransport(handler)
+    async_client = functools.partial(httpx.AsyncClient, transport=transport)
+
+    with (
+        patch("api_client.httpx.AsyncClient", async_client),
+        ThreadPoolExecutor(max_workers=1) as parse_pool,
+    ):
+        with pytest.raises(Exception, match="Data request failed: Invalid node"):
+            asyncio.run(
+                client._fetch_and_write_chunks(
+                    [DateChunk.from_dates(date(2025, 1, 1), date(2025, 1, 31))],
+                    1,
+                    "test-api-key",
+                    "https://fake-api.com?data",
+                    Mock(),
+                    parse_pool=parse_pool,
+                )
+            )
 
-    def test_month_passthrough(self):
-        """Month granularity returns value unchanged."""
-        assert (
-            EnergisClient.format_datetime("01/2025", GranularityEnum.month) == "01/2025"
-        )
 
-    def test_day_format_conversion(self):
-        """Day converts DD.MM.YYYY to YYYY-MM-DD."""
-        assert (
-            EnergisClient.format_datetime("06.03.2025", GranularityEnum.day)
-            == "2025-03-06"
-        )
-        assert (
-            EnergisClient.format_datetime("31.12.2024", GranularityEnum.day)
-            == "2024-12-31"
-        )
+@pytest.mark.parametrize("cpu_count, total_chunks", [(1, 10), (None, 10), (8, 1)])
+def test_create_parse_pool_skips_process_pool(client, cpu_count, total_chunks):
+    """Tests that one CPU or one chunk parses in the default thread executor."""
+    with patch("api_client.os.cpu_count", return_value=cpu_count):
+        assert client._create_parse_pool(total_chunks) is None
 
-    def test_hour_without_minutes(self):
-        """Hour granularity with hour range (no minutes) adds :00."""
-        assert (
-            EnergisClient.format_datetime("06.03.2025 08-09", GranularityEnum.hour)
-            == "2025-03-06 08:00"
-        )
-        assert (
-            EnergisClient.format_datetime("06.03.2025 23-00", GranularityEnum.hour)
-            == "2025-03-06 23:00"
-        )
 
-    def test_quarter_hour_with_minutes(self):
-        """QuarterHour granularity with time range preserves minutes."""
-        assert (
-            EnergisClient.format_datetime(
-                "06.03.2025 08:15-08:30", GranularityEnum.quarterHour
-            )
-            == "2025-03-06 08:15"
-        )
-        assert (
-            EnergisClient.format_datetime(
-                "06.03.2025 23:45-00:00", GranularityEnum.quarterHour
-            )
-            == "2025-03-06 23:45"
-        )
+def test_create_parse_pool_parses_in_spawned_worker(client):
+    """Tests that a chunk round-trips through the default spawned process pool."""
+    content = create_xexport_xml([("7090001", "1.5", "06.03.2025")])
 
-    def test_minute_with_minutes(self):
-        """Minute granularity with time range preserves minutes."""
-        assert (
-            EnergisClient.format_datetime(
-                "06.03.2025 08:01-08:02", GranularityEnum.minute
-            )
-            == "2025-03-06 08:01"
-        )
+    with patch("api_client.os.cpu_count", return_value=2):
+        parse_pool = client._create_parse_pool(2)
 
-    def test_day_invalid_date_raises(self):
-        """Day granularity with invalid date raises ValueError."""
-        with pytest.raises(ValueError):
-            EnergisClient.format_datetime("31.02.2025", GranularityEnum.day)
+    assert isinstance(parse_pool, ProcessPoolExecutor)
+    with parse_pool:
+        rows = parse_pool.submit(
+            parse_xexport_content, content, GranularityEnum.day
+        ).result(timeout=60)
 
-    def test_hour_missing_time_part_raises(self):
-        """Hour granularity without time part raises ValueError."""
-        with pytest.raises(ValueError):
-            EnergisClient.format_datetime("06.03.2025", GranularityEnum.hour)
+    assert rows == [("7090001", "1.5", "2025-03-06")]
@@ -0,0 +1,40 @@
+import csv
+import io
+
+import pytest
+
+from component import CsvRowWriter
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        ("7090001", "123.45", "2025-03-06 08:00"),
+        ("7090001", "1,5", "2025-03-06"),
+        ("7090001", 'say "hi"', "Q1/2025"),
+        ("7090001", "multi\nline", "2025"),
+    ],
+)
+def test_csv_row_writer_matches_csv_module(row):
+    """CsvRowWriter output is byte-identical to csv.writer with default dialect."""
+    expected = io.StringIO(newline="")
+    csv.writer(expected).writerow(row)
+
+    buffer = io.BytesIO()
+    CsvRowWriter(buffer).writerow(row)
+
+    assert buffer.getvalue() == expected.getvalue().encode("utf-8")
+
+
+def test_csv_row_writer_writerows():
+    """Multiple rows are written in one block, each terminated by CRLF."""
+    buffer = io.BytesIO()
+    writer = CsvRowWriter(buffer)
+
+    writer.writerow(["uzel", "hodnota", "cas"])
+    writer.writerows([("1", "2.5", "2025-01-01"), ("2", "3.5", "2025-01-02")])
+    writer.writerows([])
+
+    assert buffer.getvalue() == (
+        b"uzel,hodnota,cas\r\n1,2.5,2025-01-01\r\n2,3.5,2025-01-02\r\n"
+    )
@@ -1,6 +1,7 @@
 import pytest
 import logging
 from datetime import date
+from keboola.component.exceptions import UserException
 from configuration import (
     Configuration,
     Authentication,
@@ -11,8 +12,9 @@ from configuration import (
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_auth():
+    """Returns a valid Authentication instance, shared since the model is frozen."""
     return Authentication(
         username="testuser",
         **{"#password": "securepassword"},
@@ -50,7 +52,7 @@ def test_authentication_validation():
 
 def test_sync_options_validation():
     """Tests that SyncOptions enforces correct values."""
-    with pytest.raises(ValueError, match="Field 'nodes' cannot be empty"):
+    with pytest.raises(ValueError, match=r"nodes\n\s+List should have at least 1 item"):
         SyncOptions(
             dataset=DatasetEnum.xexport,
             nodes=[],
@@ -72,6 +74,21 @@ def test_sync_options_validation():
         )
 
 
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("date_from", "2025-1-5"),
+        ("date_from", "20250101"),
+        ("date_to", "2025-02-30"),
+        ("date_to", "2025-01-31T00:00"),
+    ],
+)
+def test_sync_options_rejects_invalid_dates(field, value):
+    """Tests that dates must be valid and in strict YYYY-MM-DD format."""
+    with pytest.raises(ValueError, match=f"{field}\n.*Invalid date '{value}'"):
+        SyncOptions(nodes=[12345], **{field: value})
+
+
 def test_sync_options_resolved_date_to(valid_sync_options):
     """Tests that resolved_date_to returns the correct value."""
     assert valid_sync_options.resolved_date_to == "2025-01-31"
@@ -89,10 +106,9 @@ def test_sync_options_resolved_date_to(valid_sync_options):
 def test_configuration_initialization(valid_auth, valid_sync_options, caplog):
     """Tests Configuration initialization and state handling."""
     with caplog.at_level(logging.INFO):
-        config = Configuration(
+        config = Configuration.from_dict(
+            {"authentication": valid_auth, "sync_options": valid_sync_options},
             last_processed_date="2025-01-01",
-            authentication=valid_auth,
-            sync_options=valid_sync_options,
         )
 
     assert config.sync_options.date_from == "2025-01-01"
@@ -106,14 +122,29 @@ def test_configuration_initialization(valid_auth, valid_sync_options, caplog):
 def test_configuration_validation_error():
     """Tests that Configuration raises validation errors when required fields are missing."""
     with pytest.raises(ValueError, match="Field 'username' cannot be empty"):
-        Configuration(
-            last_processed_date=None,
-            authentication=Authentication(username="", password="password"),
-            sync_options=SyncOptions(
-                dataset=DatasetEnum.xexport,
-                nodes=[12345],
-                date_from="2025-01-01",
-                date_to="2025-01-31",
-                granularity=GranularityEnum.day,
-            ),
+        Configuration.from_dict(
+            {
+                "authentication": Authentication(username="", password="password"),
+                "sync_options": SyncOptions(
+                    dataset=DatasetEnum.xexport,
+                    nodes=[12345],
+                    date_from="2025-01-01",
+                    date_to="2025-01-31",
+                    granularity=GranularityEnum.day,
+                ),
+            }
+        )
+
+
+def test_configuration_from_dict_wraps_validation_error():
+    """Tests that invalid parameters are reported as a UserException."""
+    with pytest.raises(
+        UserException,
+        match="Validation Error: sync_options.nodes: List should have at least 1 item",
+    ):
+        Configuration.from_dict(
+            {
+                "authentication": {"username": "testuser", "#password": "secret"},
+                "sync_options": {"nodes": []},
+            }
         )